@@ -1,5 +1,6 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 import os
 import json
@@ -7,9 +8,27 @@ import chardet
 import asyncio
 import google.generativeai as genai
 from typing import Optional
-import io
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import hashlib
+import zlib
+import zipfile
+import xml.etree.ElementTree as ElementTree
+import threading
+from collections import OrderedDict
 
 # Try to import document parsing libraries
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_SUPPORT = True
+except ImportError:
+    PDFIUM_SUPPORT = False
+
+# pdfplumber can do better on table-heavy PDFs; set DISABLE_PDFIUM=1 to always use it
+PDFIUM_DISABLED = os.environ.get("DISABLE_PDFIUM", "").lower() in ("1", "true", "yes")
+
 try:
     import pdfplumber
     PDF_SUPPORT = True
@@ -22,24 +41,166 @@ try:
 except ImportError:
     DOCX_SUPPORT = False
 
-app = FastAPI(title="COBOL Code Analyzer API")
+# Use orjson for response encoding when it is installed
+try:
+    import orjson
+    ORJSON_SUPPORT = True
+except ImportError:
+    ORJSON_SUPPORT = False
+
+# Prefer BLAKE3 for content hashing, fall back to the stdlib BLAKE2
+try:
+    from blake3 import blake3
+    BLAKE3_SUPPORT = True
+except ImportError:
+    BLAKE3_SUPPORT = False
+
+# pdfminer emits a debug record per content-stream operator; building them is costly
+for logger_name in ("pdfminer", "pdfplumber"):
+    logging.getLogger(logger_name).setLevel(logging.ERROR)
+
+# Threads available to CPU-bound analysis work offloaded from the event loop
+ANALYSIS_WORKERS = 32
+
+@asynccontextmanager
+async def lifespan(app):
+    executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS)
+    asyncio.get_running_loop().set_default_executor(executor)
+    yield
+    executor.shutdown(wait=False)
+
+app = FastAPI(
+    title="COBOL Code Analyzer API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if ORJSON_SUPPORT else JSONResponse,
+)
 
 # Configure CORS
+# Comma-separated list of frontend origins allowed to call the API directly
+cors_origins = os.environ.get("CORS_ORIGINS", "http://localhost:3000")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[origin.strip() for origin in cors_origins.split(",") if origin.strip()],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type"],
+    max_age=86400,  # Let browsers cache preflight responses for a day
 )
 
 # Initialize Gemini API
+GEMINI_MODEL_NAME = "gemini-pro"
 api_key = os.environ.get("GEMINI_API_KEY")
 if api_key:
     genai.configure(api_key=api_key)
+    # Shared across requests so the client and its connections are reused
+    gemini_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
 else:
+    gemini_model = None
     print("WARNING: GEMINI_API_KEY environment variable not set")
 
+# COBOL keyword patterns used by extract_metrics
+CONDITIONAL_KEYWORDS = frozenset({b"IF", b"ELSE", b"WHEN", b"EVALUATE"})
+OPEN_KEYWORDS = frozenset({b"IF", b"EVALUATE", b"PERFORM"})
+CLOSE_KEYWORDS = frozenset({b"END-IF", b"END-EVALUATE", b"END-PERFORM"})
+
+# COBOL source is ASCII, so extract_metrics scans bytes folded to upper case with this table
+# rather than calling str.upper(), which has to apply full Unicode case mapping
+UPPERCASE_TABLE = bytes.maketrans(
+    b"abcdefghijklmnopqrstuvwxyz\x1c\x1d\x1e\x1f",
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZ    ",  # str.isspace() separators that bytes \s does not cover
+)
+
+# Non-ASCII whitespace (NBSP, U+2028, U+0085, ...) mapped to a space before encoding, so it
+# stays blank for line counting instead of becoming "?"
+UNICODE_SPACE_RE = re.compile(r"[^\S\x00-\x7f]")
+
+# Matched against upper-cased source: re.IGNORECASE case-folds at every position and is
+# several times slower than upper-casing the whole source once.
+# The keywords are laid out as a trie behind a literal first character, which lets the
+# regex engine skip straight to candidate positions instead of trying every offset.
+KEYWORD_RE = re.compile(rb"""
+    [EIPW]
+    (?<![\w-].)    # Hyphens are part of COBOL words, so "END-IF" or "WS-IF-FLAG" must not match "IF"
+    (?:
+        (?<=E) (?: ND-(?:IF|EVALUATE|PERFORM) | LSE | VALUATE )
+      | (?<=I) F
+      | (?<=P) ERFORM
+      | (?<=W) HEN
+    )
+    (?![\w-])
+""", re.VERBOSE)
+
+# First non-blank character of every non-blank line
+LINE_START_RE = re.compile(rb"^[^\S\n]*(\S)", re.MULTILINE)
+
+# Characters of source code included in the Gemini prompt
+MAX_PROMPT_CODE_LENGTH = 8000
+
+GEMINI_PROMPT_TEMPLATE = """You are a COBOL code analysis expert. Analyze the following code and provide:
+1. A brief explanation of what this code does (max 3 sentences).
+2. Classify the complexity as Simple, Moderate, or Complex.
+3. Provide a confidence score for your classification (0-100).
+4. List key factors that influenced your classification.
+
+Code to analyze:
+```
+{}
+```
+
+Respond with only a JSON object of this form:
+{{"classification": "Simple" | "Moderate" | "Complex", "confidenceScore": <number 0-100>, "explanation": "<what the code does and the key factors behind the classification>"}}"""
+
+COMPLEXITY_CLASSES = frozenset({"Simple", "Moderate", "Complex"})
+
+JSON_DECODER = json.JSONDecoder()
+
+# Markdown code fence markers Gemini often puts around JSON output
+CODE_FENCE_RE = re.compile(r"```(?:json)?", re.IGNORECASE)
+
+# First number following "confidence" in a Gemini response
+CONFIDENCE_SCORE_RE = re.compile(r"\d+")
+
+# Result caches keyed by content hash
+CACHE_MAX_ENTRIES = 1024
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit/miss counters"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Entries are read and written from executor threads
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+metrics_cache = LRUCache()
+analysis_cache = LRUCache()
+
 # Models
 class CodeAnalysisRequest(BaseModel):
     code: str
@@ -50,59 +211,180 @@ class CodeAnalysisResponse(BaseModel):
     explanation: str
     chartData: dict
 
+# Minimum text length from pypdfium2 before we trust it over pdfplumber
+PDFIUM_MIN_TEXT_LENGTH = 50
+
+# PDFium is not thread-safe and pypdfium2 does not lock around it; uploads are extracted
+# on executor threads, so concurrent PDF uploads would otherwise crash the worker
+PDFIUM_LOCK = threading.Lock()
+
+# Bytes of a text upload passed to chardet when it is not valid UTF-8
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# WordprocessingML tags read when streaming a .docx body
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+WORD_PARAGRAPH_TAG = WORD_NAMESPACE + "p"
+WORD_RUN_TAG = WORD_NAMESPACE + "r"
+WORD_TEXT_TAG = WORD_NAMESPACE + "t"
+WORD_TAB_TAG = WORD_NAMESPACE + "tab"
+WORD_BREAK_TAGS = (WORD_NAMESPACE + "br", WORD_NAMESPACE + "cr")
+
+# Static parts of the chart data; only the dataset values change per request
+CHART_LABELS = ("Lines of Code", "IF/ELSE Blocks", "Variables", "Nested Depth")
+CHART_DATASET_STYLE = {
+    "label": "Code Metrics",
+    "backgroundColor": (
+        "rgba(54, 162, 235, 0.6)",
+        "rgba(255, 206, 86, 0.6)",
+        "rgba(75, 192, 192, 0.6)",
+        "rgba(153, 102, 255, 0.6)"
+    ),
+    "borderColor": (
+        "rgba(54, 162, 235, 1)",
+        "rgba(255, 206, 86, 1)",
+        "rgba(75, 192, 192, 1)",
+        "rgba(153, 102, 255, 1)"
+    ),
+    "borderWidth": 1
+}
+
 # Helper functions
-def extract_text_from_pdf(file_content):
+def extract_text_from_pdf_fast(file_obj):
+    """Extract PDF text with PDFium, skipping pdfminer's layout analysis"""
+    # PDFium streams from objects with readinto(); SpooledTemporaryFile only has it from Python 3.11
+    source = file_obj if hasattr(file_obj, "readinto") else file_obj.read()
+    with PDFIUM_LOCK:
+        pdf = pdfium.PdfDocument(source)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return "\n".join(parts)
+        finally:
+            pdf.close()
+
+def extract_text_from_pdf(file_obj):
     if not PDF_SUPPORT:
-        raise HTTPException(status_code=400, detail="PDF support not available. Install pdfplumber.")
+        raise HTTPException(status_code=400, detail="PDF support not available. Install pypdfium2 or pdfplumber.")
     
-    text = ""
-    with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+    parts = []
+    # laparams=None keeps pdfminer's layout analysis off; extract_text does its own line grouping
+    with pdfplumber.open(file_obj, laparams=None) as pdf:
         for page in pdf.pages:
-            text += page.extract_text() or ""
-    return text
+            parts.append(page.extract_text() or "")
+            # Release the parsed page objects so memory stays flat on long documents
+            page.flush_cache()
+    return "\n".join(parts)
 
-def extract_text_from_docx(file_content):
+def extract_text_from_docx_fast(file_obj):
+    """Stream paragraph text out of word/document.xml without building python-docx objects"""
+    paragraphs = []
+    parts = []
+    run_depth = 0
+    with zipfile.ZipFile(file_obj) as archive, archive.open("word/document.xml") as document:
+        for event, element in ElementTree.iterparse(document, events=("start", "end")):
+            tag = element.tag
+            if tag == WORD_RUN_TAG:
+                run_depth += 1 if event == "start" else -1
+            elif event == "start":
+                continue
+            elif tag == WORD_PARAGRAPH_TAG:
+                paragraphs.append("".join(parts))
+                parts = []
+                element.clear()
+            # Tabs and breaks also appear in paragraph properties; only those inside runs are text
+            elif run_depth:
+                if tag == WORD_TEXT_TAG:
+                    parts.append(element.text or "")
+                elif tag == WORD_TAB_TAG:
+                    parts.append("\t")
+                elif tag in WORD_BREAK_TAGS:
+                    parts.append("\n")
+    return "\n".join(paragraphs)
+
+def extract_text_from_docx(file_obj):
     if not DOCX_SUPPORT:
         raise HTTPException(status_code=400, detail="DOCX support not available. Install python-docx.")
     
-    doc = Document(io.BytesIO(file_content))
+    doc = Document(file_obj)
     text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
     return text
 
-def extract_text_from_file(file_content, file_extension):
+def decode_text(file_content):
+    """Decode a text upload, only running encoding detection when it is not UTF-8"""
+    try:
+        # utf-8-sig also strips a UTF-8 byte order mark
+        return file_content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        pass
+    
+    # chardet is pure Python; a prefix is enough for a confident guess
+    result = chardet.detect(file_content[:ENCODING_SAMPLE_SIZE])
+    encoding = result["encoding"] if result["encoding"] else "utf-8"
+    try:
+        return file_content.decode(encoding)
+    except UnicodeDecodeError:
+        return file_content.decode("latin-1")
+
+def extract_text_from_file(file_obj, file_extension):
+    """Extract text from a seekable binary file object"""
     if file_extension in [".pdf"]:
-        return extract_text_from_pdf(file_content)
+        if PDFIUM_SUPPORT and not PDFIUM_DISABLED:
+            try:
+                text = extract_text_from_pdf_fast(file_obj)
+                if len(text.strip()) >= PDFIUM_MIN_TEXT_LENGTH or not PDF_SUPPORT:
+                    return text
+            except Exception as e:
+                if not PDF_SUPPORT:
+                    raise
+                print(f"pypdfium2 extraction failed, falling back to pdfplumber: {str(e)}")
+            file_obj.seek(0)
+        return extract_text_from_pdf(file_obj)
     elif file_extension in [".docx", ".doc"]:
-        return extract_text_from_docx(file_content)
-    else:
-        # For text files, detect encoding
-        result = chardet.detect(file_content)
-        encoding = result["encoding"] if result["encoding"] else "utf-8"
         try:
-            return file_content.decode(encoding)
-        except UnicodeDecodeError:
-            return file_content.decode("latin-1")
+            return extract_text_from_docx_fast(file_obj)
+        except Exception as e:
+            if not DOCX_SUPPORT:
+                raise
+            print(f"Streaming DOCX extraction failed, falling back to python-docx: {str(e)}")
+        file_obj.seek(0)
+        return extract_text_from_docx(file_obj)
+    else:
+        return decode_text(file_obj.read())
 
 def extract_metrics(code):
     """Extract basic metrics from code content"""
-    lines = code.split("\n")
-    loc = len([line for line in lines if line.strip()])
+    if not code.isascii():
+        code = UNICODE_SPACE_RE.sub(" ", code)
+    # Other non-ASCII characters become "?", which keeps one byte per character and every line intact
+    source = code.encode("ascii", "replace").translate(UPPERCASE_TABLE)
     
-    # Count conditional blocks
-    if_else_blocks = len([line for line in lines if any(keyword in line.upper() for keyword in ["IF", "ELSE", "WHEN", "EVALUATE"])])
+    # One scan collects the leading character of each non-blank line
+    line_starts = b"".join(LINE_START_RE.findall(source))
+    loc = len(line_starts)
     
     # Count variables (simplified - looking for level numbers in COBOL)
-    variable_count = len([line for line in lines if line.strip() and line.strip()[0].isdigit()])
+    variable_count = sum(map(line_starts.count, b"0123456789"))
     
-    # Estimate nested depth
+    # Count conditional lines and estimate nested depth in a single pass over keywords
+    if_else_blocks = 0
     nested_depth = 0
     current_depth = 0
-    for line in lines:
-        line_upper = line.upper()
-        if any(keyword in line_upper for keyword in ["IF", "EVALUATE", "PERFORM"]) and "END-" not in line_upper:
+    counted_until = -1  # End of the last line already counted as conditional
+    for match in KEYWORD_RE.finditer(source):
+        keyword = match.group()
+        if keyword in CONDITIONAL_KEYWORDS and match.start() > counted_until:
+            if_else_blocks += 1
+            counted_until = source.find(b"\n", match.end())
+            if counted_until == -1:
+                counted_until = len(source)
+        if keyword in OPEN_KEYWORDS:
             current_depth += 1
             nested_depth = max(nested_depth, current_depth)
-        elif any(keyword in line_upper for keyword in ["END-IF", "END-EVALUATE", "END-PERFORM"]):
+        elif keyword in CLOSE_KEYWORDS:
             current_depth = max(0, current_depth - 1)
     
     return {
@@ -112,68 +394,109 @@ def extract_metrics(code):
         "nestedDepth": nested_depth
     }
 
-async def analyze_with_gemini(code):
-    """Analyze code using Gemini API"""
+def content_hash(code):
+    """Return a hex digest identifying the code content"""
+    data = code.encode("utf-8", "surrogatepass")
+    if BLAKE3_SUPPORT:
+        return blake3(data).hexdigest()
+    return hashlib.blake2b(data).hexdigest()
+
+def extract_metrics_cached(code, key=None):
+    """extract_metrics backed by the content-hash cache"""
+    key = key or content_hash(code)
+    metrics = metrics_cache.get(key)
+    if metrics is None:
+        metrics = extract_metrics(code)
+        metrics_cache.put(key, metrics)
+    return metrics
+
+def parse_gemini_response(response):
+    """Read the analysis from a Gemini response, preferring the requested JSON object"""
+    # The object may be wrapped in a code fence or surrounded by prose (which can itself
+    # contain braces), so decode the first object and ignore whatever follows it
+    start = response.find("{")
+    if start == -1:
+        return parse_gemini_text(response)
+    try:
+        data, _ = JSON_DECODER.raw_decode(response, start)
+        classification = str(data["classification"]).strip().capitalize()
+        if classification not in COMPLEXITY_CLASSES:
+            classification = "Moderate"
+        return {
+            "classification": classification,
+            "confidenceScore": min(100.0, max(0.0, float(data["confidenceScore"]))),
+            "explanation": str(data["explanation"])[:500]
+        }
+    except (ValueError, KeyError, TypeError):
+        # Malformed object: only scan the prose before it, never the raw JSON itself
+        prose = CODE_FENCE_RE.sub("", response[:start]).strip()
+        if prose:
+            return parse_gemini_text(prose)
+        return {
+            "classification": "Moderate",
+            "confidenceScore": 75.0,
+            "explanation": "Gemini returned an analysis that could not be parsed."
+        }
+
+def parse_gemini_text(response):
+    """Pick classification and confidence out of a free-text Gemini response"""
+    # Parse the response
+    explanation = response[:500]  # First 500 chars as explanation
+    
+    response_lower = response.lower()
+    
+    # Extract classification
+    classification = "Moderate"  # Default
+    if "simple" in response_lower:
+        classification = "Simple"
+    elif "complex" in response_lower:
+        classification = "Complex"
+    
+    # Extract confidence score if present
+    confidence_match = response_lower.find("confidence")
+    confidence_score = 75.0  # Default
+    if confidence_match != -1:
+        # Try to find a number after "confidence"
+        text_after = response[confidence_match:confidence_match+30]
+        score_match = CONFIDENCE_SCORE_RE.search(text_after)
+        if score_match:
+            confidence_score = float(score_match.group())
+            confidence_score = min(100.0, max(0.0, confidence_score))  # Ensure in range 0-100
+    
+    return {
+        "classification": classification,
+        "confidenceScore": confidence_score,
+        "explanation": explanation
+    }
+
+async def analyze_with_gemini(code, key, metrics):
+    """Analyze code using Gemini API, given its content hash and already extracted metrics"""
     if not api_key:
         # Fallback if no API key
-        return fallback_analysis(code)
+        return fallback_analysis_cached(code, key, metrics)
+    
+    cache_key = (key, GEMINI_MODEL_NAME)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
     
     try:
-        model = genai.GenerativeModel('gemini-pro')
-        prompt = f"""
-        You are a COBOL code analysis expert. Analyze the following code and provide:
-        1. A brief explanation of what this code does (max 3 sentences).
-        2. Classify the complexity as Simple, Moderate, or Complex.
-        3. Provide a confidence score for your classification (0-100).
-        4. List key factors that influenced your classification.
-        
-        Code to analyze:
-        ```
-        {code[:8000]}  # Limit code length
-        ```
-        
-        Format your response in plain text with clear sections.
-        """
+        prompt = GEMINI_PROMPT_TEMPLATE.format(code[:MAX_PROMPT_CODE_LENGTH])
         
-        response = await asyncio.to_thread(
-            lambda: model.generate_content(prompt).text
-        )
+        response = (await gemini_model.generate_content_async(prompt)).text
         
-        # Parse the response
-        explanation = response[:500]  # First 500 chars as explanation
-        
-        # Extract classification
-        classification = "Moderate"  # Default
-        if "simple" in response.lower():
-            classification = "Simple"
-        elif "complex" in response.lower():
-            classification = "Complex"
-        
-        # Extract confidence score if present
-        confidence_match = response.lower().find("confidence")
-        confidence_score = 75.0  # Default
-        if confidence_match != -1:
-            # Try to find a number after "confidence"
-            text_after = response[confidence_match:confidence_match+30]
-            import re
-            score_match = re.search(r'\d+', text_after)
-            if score_match:
-                confidence_score = float(score_match.group())
-                confidence_score = min(100.0, max(0.0, confidence_score))  # Ensure in range 0-100
-        
-        return {
-            "classification": classification,
-            "confidenceScore": confidence_score,
-            "explanation": explanation
-        }
+        result = parse_gemini_response(response)
+        analysis_cache.put(cache_key, result)
+        return result
         
     except Exception as e:
         print(f"Error calling Gemini API: {str(e)}")
-        return fallback_analysis(code)
+        return fallback_analysis_cached(code, key, metrics)
 
-def fallback_analysis(code):
+def fallback_analysis(code, metrics=None):
     """Fallback analysis when Gemini API is unavailable"""
-    metrics = extract_metrics(code)
+    if metrics is None:
+        metrics = extract_metrics(code)
     
     # Simple scoring system
     complexity_score = 0
@@ -202,16 +525,19 @@ def fallback_analysis(code):
     elif metrics["nestedDepth"] < 7: complexity_score += 3
     else: complexity_score += 4
     
+    # Deterministic random-like jitter derived from the metrics, stable across processes
+    jitter = zlib.crc32(f"{metrics['loc']}:{metrics['ifElseBlocks']}:{metrics['variableCount']}:{metrics['nestedDepth']}".encode())
+    
     # Classification based on total score
     if complexity_score <= 6:
         classification = "Simple"
-        confidence_score = 85 + (hash(code) % 10)  # Deterministic random-like number
+        confidence_score = 85 + (jitter % 10)
     elif complexity_score <= 10:
         classification = "Moderate"
-        confidence_score = 75 + (hash(code) % 15)
+        confidence_score = 75 + (jitter % 15)
     else:
         classification = "Complex"
-        confidence_score = 80 + (hash(code) % 15)
+        confidence_score = 80 + (jitter % 15)
     
     return {
         "classification": classification,
@@ -219,42 +545,35 @@ def fallback_analysis(code):
         "explanation": "Analysis performed using metrics-based classification. Enable Gemini API for more detailed analysis."
     }
 
-@app.get("/")
-async def root():
-    return {"message": "COBOL Code Analyzer API is running"}
+def fallback_analysis_cached(code, key=None, metrics=None):
+    """fallback_analysis backed by the content-hash cache"""
+    cache_key = (key or content_hash(code), "fallback")
+    analysis = analysis_cache.get(cache_key)
+    if analysis is None:
+        analysis = fallback_analysis(code, metrics)
+        analysis_cache.put(cache_key, analysis)
+    return analysis
 
-@app.post("/analyze", response_model=CodeAnalysisResponse)
-async def analyze_code(request: CodeAnalysisRequest):
-    """Analyze code content directly"""
-    if not request.code or not isinstance(request.code, str):
+async def analyze_source(code):
+    """Build the analysis payload shared by /analyze and /upload"""
+    if not code or not isinstance(code, str):
         raise HTTPException(status_code=400, detail="Invalid request: Code content is required")
     
     try:
+        key = content_hash(code)
+        
         # Extract metrics
-        metrics = extract_metrics(request.code)
+        metrics = await asyncio.to_thread(extract_metrics_cached, code, key)
         
         # Get Gemini analysis
-        gemini_analysis = await analyze_with_gemini(request.code)
+        gemini_analysis = await analyze_with_gemini(code, key, metrics)
         
         # Prepare chart data
         chart_data = {
-            "labels": ["Lines of Code", "IF/ELSE Blocks", "Variables", "Nested Depth"],
+            "labels": CHART_LABELS,
             "datasets": [{
-                "label": "Code Metrics",
-                "data": [metrics["loc"], metrics["ifElseBlocks"], metrics["variableCount"], metrics["nestedDepth"]],
-                "backgroundColor": [
-                    "rgba(54, 162, 235, 0.6)",
-                    "rgba(255, 206, 86, 0.6)",
-                    "rgba(75, 192, 192, 0.6)",
-                    "rgba(153, 102, 255, 0.6)"
-                ],
-                "borderColor": [
-                    "rgba(54, 162, 235, 1)",
-                    "rgba(255, 206, 86, 1)",
-                    "rgba(75, 192, 192, 1)",
-                    "rgba(153, 102, 255, 1)"
-                ],
-                "borderWidth": 1
+                **CHART_DATASET_STYLE,
+                "data": [metrics["loc"], metrics["ifElseBlocks"], metrics["variableCount"], metrics["nestedDepth"]]
             }]
         }
         
@@ -271,6 +590,24 @@ async def analyze_code(request: CodeAnalysisRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing code: {str(e)}")
 
+@app.get("/")
+async def root():
+    return {"message": "COBOL Code Analyzer API is running"}
+
+@app.get("/stats")
+async def stats():
+    """Report result cache statistics"""
+    return {
+        "hashAlgorithm": "blake3" if BLAKE3_SUPPORT else "blake2b",
+        "metricsCache": metrics_cache.stats(),
+        "analysisCache": analysis_cache.stats()
+    }
+
+@app.post("/analyze", response_model=CodeAnalysisResponse)
+async def analyze_code(request: CodeAnalysisRequest):
+    """Analyze code content directly"""
+    return await analyze_source(request.code)
+
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
     """Upload and analyze a file"""
@@ -279,19 +616,21 @@ async def upload_file(file: UploadFile = File(...)):
         filename = file.filename
         file_extension = os.path.splitext(filename)[1].lower()
         
-        # Read file content
-        file_content = await file.read()
+        # The upload is already spooled to a temporary file (on disk once it is large),
+        # so parse from that file instead of reading the whole body into memory
+        await file.seek(0)
         
         # Extract text based on file type
         try:
-            text_content = extract_text_from_file(file_content, file_extension)
+            text_content = await asyncio.to_thread(extract_text_from_file, file.file, file_extension)
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Error extracting text from file: {str(e)}")
         
         # Analyze the extracted text
-        request = CodeAnalysisRequest(code=text_content)
-        return await analyze_code(request)
+        return await analyze_source(text_content)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 